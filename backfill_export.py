@@ -2,26 +2,39 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import functools
 import logging
+import os
 import re
 import sqlite3
-import time as _time
 from datetime import date, datetime, time, timedelta
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
 from env_loader import load_project_env
-from study_tracker import DB_PATH, POST_HOUR, POST_MINUTE, TZ, build_leaderboard_snapshot
-from web_export import build_export_payload, send_export
+from study_tracker import (
+    DB_PATH,
+    POST_HOUR,
+    POST_MINUTE,
+    TZ,
+    SecondsFrame,
+    build_leaderboard_snapshot,
+    ensure_connected,
+)
+from web_export import build_export_payload, send_export, send_export_batch
 
 load_project_env()
 
 logger = logging.getLogger("tracker")
 
 DEFAULT_WINDOW_DAYS = 60
+# Month boards are 30-day blocks, so a snapshot can reach ~30 days either side of its date.
+FRAME_PAD_DAYS = 31
 LOG_FILES: list[Path] = [Path("var/tracker.log"), Path("var/tracker_2.log")]
-_AUTO_RE = re.compile(r"Posted leaderboard for (\d{4}-\d{2}-\d{2}) \(mark_daily=True\)")
-_VALID_SCOPES = {"day", "week", "month"}
+_AUTO_GUARD = b"Posted leaderboard for "
+_AUTO_RE = re.compile(rb"Posted leaderboard for (\d{4}-\d{2}-\d{2}) \(mark_daily=True\)")
+_VALID_SCOPES = frozenset({"day", "week", "month"})
+_REQUIRED_ENTRY_FIELDS = frozenset(("rank", "user_id", "minutes", "seconds"))
 
 
 def _parse_date(value: str) -> date:
@@ -41,57 +54,142 @@ def _resolve_range(args, parser: argparse.ArgumentParser) -> tuple[date, date]:
 
 
 def _iter_dates(start: date, end: date):
-    cur = start
-    while cur <= end:
-        yield cur
-        cur += timedelta(days=1)
+    for ordinal in range(start.toordinal(), end.toordinal() + 1):
+        yield date.fromordinal(ordinal)
 
 
-def _auto_dates_from_logs() -> set[date]:
+def _tail_lines(path: Path, block: int = 65536) -> Iterator[bytes]:
+    """Yield the lines of a file newest-first, reading it backwards in fixed blocks."""
+    with path.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            lines = buf.split(b"\n")
+            # The first piece may be the tail of a line that starts in the previous block.
+            buf = lines[0]
+            yield from reversed(lines[1:])
+        if buf:
+            yield buf
+
+
+@functools.lru_cache(maxsize=1)
+def _auto_dates_from_logs(start_date: date | None = None) -> frozenset[date]:
+    """
+    Collect dates of automatic posts, scanning each log newest-first.
+    With start_date set, stop reading a log after its first hit older than the
+    window; that hit is kept so min() still reports that automatic posting
+    predates it. Every file in LOG_FILES is still scanned.
+    """
+    cutoff = start_date - timedelta(days=1) if start_date else None
     dates: set[date] = set()
     for path in LOG_FILES:
         try:
-            data = path.read_text(encoding="utf-8", errors="ignore")
+            for line in _tail_lines(path):
+                # Cheap substring guard first; the regex only runs anchored at the hit.
+                idx = line.find(_AUTO_GUARD)
+                if idx < 0:
+                    continue
+                match = _AUTO_RE.match(line, idx)
+                if not match:
+                    continue
+                try:
+                    hit = date.fromisoformat(match.group(1).decode("ascii"))
+                except ValueError:
+                    continue
+                dates.add(hit)
+                if cutoff and hit < cutoff:
+                    break
         except OSError:
             continue
-        for match in _AUTO_RE.finditer(data):
-            try:
-                dates.add(date.fromisoformat(match.group(1)))
-            except ValueError:
-                continue
-    return dates
+    return frozenset(dates)
+
+
+@functools.lru_cache(maxsize=1)
+def _ro_conn() -> sqlite3.Connection:
+    """Shared read-only connection to the tracker DB, reused for every backfill query."""
+    uri = f"{Path(DB_PATH).resolve().as_uri()}?mode=ro"
+    con = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    con.execute("PRAGMA query_only=1")
+    con.execute("PRAGMA mmap_size=268435456")
+    con.execute("PRAGMA cache_size=-65536")
+    con.execute("PRAGMA temp_store=MEMORY")
+    return con
 
 
-def _dates_with_tracked_seconds() -> set[date]:
+@functools.lru_cache(maxsize=1)
+def _dates_with_tracked_seconds() -> frozenset[date]:
     if not DB_PATH:
-        return set()
+        return frozenset()
     try:
-        con = sqlite3.connect(DB_PATH)
+        con = _ro_conn()
     except Exception:
-        return set()
-    try:
-        rows = con.execute("SELECT DISTINCT d FROM seconds_totals").fetchall()
-    finally:
-        con.close()
+        return frozenset()
+    rows = con.execute("SELECT DISTINCT d FROM seconds_totals").fetchall()
     dates: set[date] = set()
     for (d_str,) in rows:
         try:
             dates.add(date.fromisoformat(d_str))
         except ValueError:
             continue
-    return dates
+    return frozenset(dates)
+
+
+def _load_seconds_range(start: date, end: date) -> SecondsFrame:
+    """Fetch every seconds_totals row in [start, end] with one range scan, grouped by day."""
+    by_day: dict[date, list[tuple[int, int]]] = {}
+    if not DB_PATH:
+        return SecondsFrame(by_day)
+    try:
+        con = _ro_conn()
+    except Exception:
+        return SecondsFrame(by_day)
+    rows = con.execute(
+        "SELECT user_id, d, seconds FROM seconds_totals WHERE d BETWEEN ? AND ?",
+        (start.isoformat(), end.isoformat()),
+    ).fetchall()
+    for uid, d_str, secs in rows:
+        try:
+            d = date.fromisoformat(d_str)
+        except ValueError:
+            continue
+        by_day.setdefault(d, []).append((int(uid), int(secs)))
+    return SecondsFrame(by_day)
+
+
+async def build_snapshot_from_frame(frame: SecondsFrame, d: date) -> dict:
+    snapshot_dt = datetime.combine(d, time(POST_HOUR, POST_MINUTE), tzinfo=TZ)
+    return await build_leaderboard_snapshot(snapshot_dt, seconds_frame=frame)
+
+
+def _day_bitmap(days: Iterable[date], start: date, span: int) -> bytearray:
+    """One byte per day of [start, start + span); days outside the window are ignored."""
+    bitmap = bytearray(span)
+    for d in days:
+        idx = (d - start).days
+        if 0 <= idx < span:
+            bitmap[idx] = 1
+    return bitmap
 
 
 def _candidate_dates(start_date: date, end_date: date) -> Iterable[tuple[date, str]]:
-    log_dates = _auto_dates_from_logs()
+    log_dates = _auto_dates_from_logs(start_date)
     data_dates = _dates_with_tracked_seconds()
-    earliest_logged = min(log_dates) if log_dates else None
-    for d in _iter_dates(start_date, end_date):
-        if d in log_dates:
+    span = (end_date - start_date).days + 1
+    log_bm = _day_bitmap(log_dates, start_date, span)
+    data_bm = _day_bitmap(data_dates, start_date, span)
+    # Once automatic posting started, only logged days count; DB-only days are skipped.
+    skip_from = max(0, (min(log_dates) - start_date).days) if log_dates else span
+    for i, d in enumerate(_iter_dates(start_date, end_date)):
+        if log_bm[i]:
             yield d, "log"
-        elif earliest_logged and d >= earliest_logged:
+        elif i >= skip_from:
             continue
-        elif d in data_dates:
+        elif data_bm[i]:
             yield d, "db"
 
 
@@ -116,66 +214,123 @@ def _validate_payload(payload: dict) -> tuple[bool, str]:
         for entry in entries:
             if not isinstance(entry, dict):
                 return False, "entry not an object"
-            required_fields = ("rank", "user_id", "minutes", "seconds")
-            if any(k not in entry for k in required_fields):
+            if not _REQUIRED_ENTRY_FIELDS.issubset(entry):
                 return False, "entry missing required fields"
     return True, "ok"
 
 
-async def _run_backfill(start_date: date, end_date: date, *, inspect: bool) -> None:
+def _backfill_concurrency() -> int:
+    raw = os.environ.get("BACKFILL_CONCURRENCY", "16").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        value = 16
+    return max(1, value)
+
+
+class _LazyScopes:
+    """Joins distinct board scopes only when a log record is actually formatted."""
+
+    __slots__ = ("boards",)
+
+    def __init__(self, boards: list) -> None:
+        self.boards = boards
+
+    def __str__(self) -> str:
+        return ",".join(dict.fromkeys(str(b.get("scope")) for b in self.boards if isinstance(b, dict)))
+
+
+def _log_send_result(label: str, scopes: _LazyScopes, resp) -> None:
+    status, body = (resp or (None, "")) if isinstance(resp, tuple) else (None, "")
+    if status is None:
+        logger.info(
+            "backfill_export: sent snapshot for %s scopes=[%s]",
+            label,
+            scopes,
+        )
+    elif 200 <= status < 300:
+        logger.info(
+            "backfill_export: sent snapshot for %s scopes=[%s] status=%s",
+            label,
+            scopes,
+            status,
+        )
+    else:
+        logger.warning(
+            "backfill_export: send failed for %s scopes=[%s] status=%s body=%s",
+            label,
+            scopes,
+            status,
+            body,
+        )
+
+
+async def _run_backfill(start_date: date, end_date: date, *, inspect: bool, batch_size: int = 1) -> None:
     targets = list(_candidate_dates(start_date, end_date))
     if not targets:
         logger.info("backfill_export: no automatic snapshots found in range")
         return
 
-    for d, origin in targets:
-        snapshot_dt = datetime.combine(d, time(POST_HOUR, POST_MINUTE), tzinfo=TZ)
+    frame = _load_seconds_range(
+        targets[0][0] - timedelta(days=FRAME_PAD_DAYS),
+        targets[-1][0] + timedelta(days=FRAME_PAD_DAYS),
+    )
+    sem = asyncio.Semaphore(_backfill_concurrency())
+    batching = batch_size > 1 and not inspect
+
+    async def _one(d: date, origin: str):
+        async with sem:
+            try:
+                snapshot = await build_snapshot_from_frame(frame, d)
+                payload = build_export_payload(snapshot)
+                ok, detail = _validate_payload(payload)
+                if not ok:
+                    logger.warning("backfill_export: skipping %s (%s)", d.isoformat(), detail)
+                    return None
+
+                boards = payload.get("boards", [])
+                if inspect:
+                    for board in boards:
+                        entries = board.get("entries") or []
+                        scope = board.get("scope")
+                        print(
+                            f"{d.isoformat()} scope={scope} entries={len(entries)} "
+                            f"chat_id={payload.get('chat_id')} message_id={payload.get('message_id')} origin={origin}"
+                        )
+                    return None
+
+                if batching:
+                    return d, snapshot, boards
+
+                resp = await asyncio.to_thread(send_export, snapshot, capture_response=True, keep_alive=True)
+                _log_send_result(d.isoformat(), _LazyScopes(boards), resp)
+            except Exception as exc:
+                logger.error("backfill_export: failed for %s: %r", d.isoformat(), exc)
+            await asyncio.sleep(0.2)
+            return None
+
+    # Connect (and authorize) once up front; otherwise every concurrent snapshot
+    # sees a cold client and races its own connect()/start().
+    await ensure_connected()
+    results = await asyncio.gather(*[_one(d, o) for d, o in targets], return_exceptions=True)
+    if not batching:
+        return
+
+    ready = [r for r in results if isinstance(r, tuple)]
+    for offset in range(0, len(ready), batch_size):
+        chunk = ready[offset:offset + batch_size]
+        label = f"{chunk[0][0].isoformat()}..{chunk[-1][0].isoformat()} ({len(chunk)} days)"
         try:
-            snapshot = await build_leaderboard_snapshot(snapshot_dt)
-            payload = build_export_payload(snapshot)
-            ok, detail = _validate_payload(payload)
-            if not ok:
-                logger.warning("backfill_export: skipping %s (%s)", d.isoformat(), detail)
-                continue
-
-            boards = payload.get("boards", [])
-            if inspect:
-                for board in boards:
-                    entries = board.get("entries") or []
-                    scope = board.get("scope")
-                    print(
-                        f"{d.isoformat()} scope={scope} entries={len(entries)} "
-                        f"chat_id={payload.get('chat_id')} message_id={payload.get('message_id')} origin={origin}"
-                    )
-                continue
-
-            resp = send_export(snapshot, capture_response=True)
-            status, body = (resp or (None, "")) if isinstance(resp, tuple) else (None, "")
-            scopes = ",".join(str(b.get("scope")) for b in boards if isinstance(b, dict))
-            if status is None:
-                logger.info(
-                    "backfill_export: sent snapshot for %s scopes=[%s]",
-                    d.isoformat(),
-                    scopes,
-                )
-            elif 200 <= status < 300:
-                logger.info(
-                    "backfill_export: sent snapshot for %s scopes=[%s] status=%s",
-                    d.isoformat(),
-                    scopes,
-                    status,
-                )
-            else:
-                logger.warning(
-                    "backfill_export: send failed for %s scopes=[%s] status=%s body=%s",
-                    d.isoformat(),
-                    scopes,
-                    status,
-                    body,
-                )
+            resp = await asyncio.to_thread(
+                send_export_batch,
+                [snap for _, snap, _ in chunk],
+                capture_response=True,
+                keep_alive=True,
+            )
+            _log_send_result(label, _LazyScopes([b for _, _, boards in chunk for b in boards]), resp)
         except Exception as exc:
-            logger.error("backfill_export: failed for %s: %r", d.isoformat(), exc)
-        _time.sleep(0.2)
+            logger.error("backfill_export: failed for %s: %r", label, exc)
+        await asyncio.sleep(0.2)
 
 
 def main() -> None:
@@ -190,6 +345,12 @@ def main() -> None:
         action="store_true",
         help="Dry-run mode: print snapshots that would be sent without calling the ingest API.",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Snapshots per ingest request; values above 1 send gzip {\"batch\": [...]} bodies.",
+    )
     args = parser.parse_args()
 
     start_date, end_date = _resolve_range(args, parser)
@@ -198,7 +359,7 @@ def main() -> None:
         start_date.isoformat(),
         end_date.isoformat(),
     )
-    asyncio.run(_run_backfill(start_date, end_date, inspect=args.inspect))
+    asyncio.run(_run_backfill(start_date, end_date, inspect=args.inspect, batch_size=args.batch_size))
 
 
 if __name__ == "__main__":
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, Mapping, Optional
+import sys
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
 
-# Canonical emoji mapping used throughout the tracker.
-NORMAL_SET: Dict[str, str] = {
+_RAW_NORMAL_SET: Dict[str, str] = {
     "AIRPLANE": "✈️",
     "ALEMBIC": "⚗️",
     "ANCHOR": "⚓",
@@ -127,7 +128,29 @@ NORMAL_SET: Dict[str, str] = {
     "WRENCH": "🔧",
 }
 
+# Canonical emoji mapping used throughout the tracker (read-only, interned keys/values).
+NORMAL_SET: Mapping[str, str] = MappingProxyType(
+    {sys.intern(key): sys.intern(value) for key, value in _RAW_NORMAL_SET.items()}
+)
+
+
 _TOKEN_PATTERN = re.compile(r"{([A-Z0-9_]+)}")
+_KEY_PATTERN = re.compile(r"[A-Z0-9_]+")
+
+
+def _build_substitution(pairs: Iterable[Tuple[str, Optional[str]]]) -> Tuple[Optional[re.Pattern[str]], Dict[str, str]]:
+    """Compile one alternation over the literal {KEY} tokens that have a value."""
+    table = {
+        sys.intern("{" + key + "}"): value
+        for key, value in pairs
+        if value is not None and _KEY_PATTERN.fullmatch(key)
+    }
+    if not table:
+        return None, table
+    return re.compile("|".join(re.escape(token) for token in table)), table
+
+
+_DEFAULT_RE, _DEFAULT_TABLE = _build_substitution(NORMAL_SET.items())
 
 
 def resolve_tokens(text: str, mapping: Mapping[str, Optional[str]] | None = None) -> str:
@@ -136,12 +159,18 @@ def resolve_tokens(text: str, mapping: Mapping[str, Optional[str]] | None = None
     When a mapping value is None or the key is unknown the token is left intact.
     """
 
-    if mapping is None:
-        mapping = NORMAL_SET
+    if "{" not in text:
+        return text
+    if mapping is None or mapping is NORMAL_SET:
+        if _DEFAULT_RE is None:
+            return text
+        # Only known tokens are in the alternation, so every match has a table entry.
+        return _DEFAULT_RE.sub(lambda match: _DEFAULT_TABLE[match.group(0)], text)
+    if not mapping:
+        return text
 
     def _replacement(match: re.Match[str]) -> str:
-        key = match.group(1)
-        value = mapping.get(key)
+        value = mapping.get(match.group(1))
         if value is None:
             return match.group(0)
         return value
@@ -3,15 +3,28 @@
 from __future__ import annotations
 
 import os
+import re
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Tuple
 
-from secure_env import load_secure_env, SecureEnvStore
+from secure_env import DEFAULT_STORE, SecureEnvStore
 
 BASE_DIR = Path(__file__).resolve().parent
 ENV_FILE = BASE_DIR / ".env.local"
 SECURE_STORE = SecureEnvStore()
 
+# (secure store values, .env.local values) keyed by both files' mtimes.
+_ENV_CACHE: Dict[Tuple[int, int], Tuple[Dict[str, str], Dict[str, str]]] = {}
+
+# KEY=VALUE per line; comment lines (leading "#") and lines without "=" never match.
+_ENV_RE = re.compile(r"^[^\S\n]*([^#=\s][^=\n]*?)[^\S\n]*=[^\S\n]*(.*?)[^\S\n]*$", re.MULTILINE)
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in {'"', "'"}:
+        return value[1:-1]
+    return value
+
 
 def _parse_env_file(path: Path) -> Dict[str, str]:
     values: Dict[str, str] = {}
@@ -22,31 +35,36 @@ def _parse_env_file(path: Path) -> Dict[str, str]:
     except OSError:
         return values
 
-    for raw_line in data.splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        key = key.strip()
-        if not key:
-            continue
-        value = value.strip()
-        if value and len(value) >= 2 and value[0] == value[-1] and value[0] in {'"', "'"}:
-            value = value[1:-1]
-        values[key] = value
+    # Same line boundaries as str.splitlines (\r, \r\n, \f, \v, ...), as plain \n.
+    data = "\n".join(data.splitlines())
+    for key, value in _ENV_RE.findall(data):
+        values[key] = _unquote(value)
     return values
 
 
+def _mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
 def load_project_env(overwrite: bool = False) -> Dict[str, str]:
     """
     Load secrets from the DPAPI store and fall back to .env.local for public
     defaults. Values already set in os.environ win unless overwrite=True.
     """
-    secure_values = load_secure_env(overwrite=overwrite)
-    file_values = _parse_env_file(ENV_FILE)
-    for key, value in file_values.items():
-        if overwrite or key not in os.environ:
-            os.environ[key] = value
+    key = (_mtime_ns(DEFAULT_STORE.path), _mtime_ns(ENV_FILE))
+    cached = _ENV_CACHE.get(key)
+    if cached is None:
+        _ENV_CACHE.clear()
+        cached = _ENV_CACHE[key] = (DEFAULT_STORE.load(), _parse_env_file(ENV_FILE))
+    secure_values, file_values = cached
+    # Apply to os.environ on every call so later callers still see the values.
+    for source in (secure_values, file_values):
+        for name, value in source.items():
+            if overwrite or name not in os.environ:
+                os.environ[name] = value
     merged = dict(file_values)
     merged.update(secure_values)
     return merged
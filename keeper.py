@@ -6,6 +6,9 @@ from telethon.sessions import StringSession
 
 from env_loader import load_project_env
 
+try: import orjson  # optional: faster state (de)serialization
+except ImportError: orjson = None
+
 BASE = Path(__file__).resolve().parent
 HEARTBEAT = BASE / "tracker.lock"
 STATE_FILE = BASE / "tracker_state.json"     # already present
@@ -27,20 +30,26 @@ def uptime_seconds() -> int:
     return ctypes.windll.kernel32.GetTickCount64() // 1000
 
 def is_stale(now: int) -> bool:
-    if not HEARTBEAT.exists():
-        return True
+    try: fd = os.open(HEARTBEAT, os.O_RDONLY)
+    except OSError: return True  # missing or unopenable heartbeat counts as stale
     try:
-        ts = int(HEARTBEAT.read_text(encoding="utf-8").strip())
-    except Exception:
-        ts = int(HEARTBEAT.stat().st_mtime)
+        try: ts = int(os.read(fd, 32))  # tracker writes a bare epoch int
+        except (OSError, ValueError): ts = int(os.fstat(fd).st_mtime)
+    except OSError: return True
+    finally: os.close(fd)
     return (now - ts) > STALE_AFTER
 
 def load_state():
-    try: return json.loads(STATE_FILE.read_text(encoding="utf-8"))
+    try:
+        raw = STATE_FILE.read_bytes()
+        return orjson.loads(raw) if orjson else json.loads(raw)
     except Exception: return {"crash_sent": False, "last_alert_ts": 0}
 
 def save_state(st):
-    try: STATE_FILE.write_text(json.dumps(st), encoding="utf-8")
+    tmp = STATE_FILE.with_suffix(".json.tmp")  # write aside, then swap in atomically
+    try:
+        tmp.write_bytes(orjson.dumps(st) if orjson else json.dumps(st).encode("utf-8"))
+        os.replace(tmp, STATE_FILE)
     except Exception: pass
 
 def find_session():
@@ -96,8 +105,11 @@ async def main():
             st["crash_sent"] = True
             st["last_alert_ts"] = now
             save_state(st)
-            await send_dm(client, "⚠️ StudyTracker CRASH detected. Auto-restarting…")
-            restart_task()
+            # spawn schtasks off the event loop so the DM send isn't stalled
+            await asyncio.gather(
+                send_dm(client, "⚠️ StudyTracker CRASH detected. Auto-restarting…"),
+                asyncio.to_thread(restart_task),
+            )
 
         elif (not stale) and st.get("crash_sent", False) and SEND_RECOVERY:
             delta = now - st.get("last_alert_ts", now)
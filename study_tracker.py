@@ -492,6 +492,40 @@ def db_fetch_period_seconds(start_date: datetime, end_date: datetime, min_daily:
     rows = cur.fetchall(); con.close()
     return [(int(uid), int(sec)) for (uid, sec) in rows]
 
+def frame_period_seconds(frame: dict[date, list[tuple[int, int]]], start_date: datetime, end_date: datetime, min_daily: int = 0):
+    """
+    Same result as db_fetch_period_seconds, but summed from a preloaded
+    {day: [(user_id, seconds), ...]} frame instead of querying SQLite.
+    """
+    totals: dict[int, int] = {}
+    d = start_date.date(); ed = end_date.date()
+    while d <= ed:
+        for uid, secs in frame.get(d, ()):
+            if min_daily > 0 and secs < min_daily:
+                continue
+            totals[uid] = totals.get(uid, 0) + secs
+        d += timedelta(days=1)
+    return sorted(((uid, s) for uid, s in totals.items() if s > 0), key=lambda x: x[1], reverse=True)
+
+class SecondsFrame:
+    """
+    Preloaded seconds_totals rows ({day: [(user_id, seconds)]}) for building many
+    snapshots in a row. Period sums are memoized: consecutive days fall into the
+    same anchor-aligned week/month block, so those totals are computed once per block.
+    """
+
+    def __init__(self, by_day: dict[date, list[tuple[int, int]]]):
+        self.by_day = by_day
+        self._periods: dict[tuple[date, date, int], list[tuple[int, int]]] = {}
+
+    def period_seconds(self, start_date: datetime, end_date: datetime, min_daily: int = 0):
+        key = (start_date.date(), end_date.date(), int(min_daily))
+        rows = self._periods.get(key)
+        if rows is None:
+            rows = frame_period_seconds(self.by_day, start_date, end_date, min_daily=min_daily)
+            self._periods[key] = rows
+        return rows
+
 # ---------- Quotes (Word of the Day) ----------
 def _load_quotes(path="quotes.txt"):
     lines = []
@@ -962,6 +996,7 @@ async def _build_leaderboard_context(
     session_accum_secs: dict[int, int] | None = None,
     session_qualified: dict[int, bool] | None = None,
     override_now: datetime | None = None,
+    seconds_frame: SecondsFrame | None = None,
 ):
     await ensure_connected()
     now = override_now or datetime.now(TZ)
@@ -982,9 +1017,11 @@ async def _build_leaderboard_context(
     t_end   = datetime(now.year, now.month, now.day, 23, 59, 59, tzinfo=TZ)
     today_str = now.date().isoformat()
 
-    day_rows   = _unique_sorted(db_fetch_period_seconds(t_start, t_end,   min_daily=MIN_DAILY_SECONDS))
-    week_rows  = _unique_sorted(db_fetch_period_seconds(w_start,  w_end,  min_daily=MIN_DAILY_SECONDS))
-    month_rows = _unique_sorted(db_fetch_period_seconds(m_start, m_end,   min_daily=MIN_DAILY_SECONDS))
+    _period = seconds_frame.period_seconds if seconds_frame is not None else db_fetch_period_seconds
+
+    day_rows   = _unique_sorted(_period(t_start, t_end,   min_daily=MIN_DAILY_SECONDS))
+    week_rows  = _unique_sorted(_period(w_start,  w_end,  min_daily=MIN_DAILY_SECONDS))
+    month_rows = _unique_sorted(_period(m_start, m_end,   min_daily=MIN_DAILY_SECONDS))
 
     day_rows   = _fold_alias_rows(day_rows, alias_to_canon)
     week_rows  = _fold_alias_rows(week_rows, alias_to_canon)
@@ -1160,8 +1197,12 @@ async def build_leaderboard_snapshot(
     live_seen_snapshot: dict[int, float] | None = None,
     session_accum_secs: dict[int, int] | None = None,
     session_qualified: dict[int, bool] | None = None,
+    seconds_frame: SecondsFrame | None = None,
 ) -> Dict[str, Any]:
-    """Build the export snapshot payload for a given moment in time."""
+    """
+    Build the export snapshot payload for a given moment in time.
+    seconds_frame: optional preloaded SecondsFrame used instead of querying SQLite.
+    """
     snap_dt = snapshot_dt
     if snap_dt.tzinfo is None:
         snap_dt = snap_dt.replace(tzinfo=TZ)
@@ -1173,6 +1214,7 @@ async def build_leaderboard_snapshot(
         session_accum_secs=session_accum_secs,
         session_qualified=session_qualified,
         override_now=snap_dt,
+        seconds_frame=seconds_frame,
     )
     return _snapshot_payload_from_context(context, snap_dt, send_result=None)
 
@@ -2,18 +2,28 @@
 
 from __future__ import annotations
 
+import gzip
+import http.client
 import json
 import logging
 import os
 import threading
+import urllib.parse
 import urllib.request
-from typing import Any, Dict
+from typing import Any, Dict, List
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 
 _LOGGER = logging.getLogger("tracker")
 
 _TRUE_VALUES = {"1", "true", "yes", "on"}
 
+_CONN_LOCAL = threading.local()
+
 
 def _should_export() -> bool:
     enabled = os.getenv("LEADERBOARD_WEB_EXPORT_ENABLED", "").strip().lower()
@@ -37,6 +47,12 @@ def _timeout_seconds() -> float:
     return millis / 1000.0
 
 
+def _dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload).encode("utf-8")
+
+
 def build_export_payload(snapshot: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "posted_at": snapshot.get("posted_at"),
@@ -47,27 +63,88 @@ def build_export_payload(snapshot: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _post_snapshot(snapshot: Dict[str, Any], *, capture_response: bool = False):
-    url = os.getenv("LEADERBOARD_INGEST_URL")
-    secret = os.getenv("LEADERBOARD_INGEST_SECRET")
-    if not url or not secret:
+def _keep_alive_connection(url: str) -> http.client.HTTPConnection:
+    """Per-thread persistent connection to the ingest host (reused across backfill posts)."""
+    parts = urllib.parse.urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    conn = getattr(_CONN_LOCAL, "conn", None)
+    if conn is not None and getattr(_CONN_LOCAL, "key", None) == key:
+        return conn
+    if conn is not None:
+        conn.close()
+    conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    conn = conn_cls(parts.netloc, timeout=_timeout_seconds())
+    _CONN_LOCAL.conn = conn
+    _CONN_LOCAL.key = key
+    return conn
+
+
+def _drop_keep_alive_connection() -> None:
+    conn = getattr(_CONN_LOCAL, "conn", None)
+    _CONN_LOCAL.conn = None
+    if conn is not None:
+        conn.close()
+
+
+def _post_keep_alive(url: str, data: bytes, headers: Dict[str, str], *, capture_response: bool = False):
+    parts = urllib.parse.urlsplit(url)
+    path = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+    try:
+        for attempt in range(2):
+            conn = _keep_alive_connection(url)
+            try:
+                conn.request("POST", path, body=data, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive socket; reconnect once.
+                _drop_keep_alive_connection()
+                if attempt:
+                    raise
+        status = resp.status
+        if resp.will_close:
+            _drop_keep_alive_connection()
+    except Exception as exc:  # pragma: no cover - network failures are logged
+        _drop_keep_alive_connection()
+        _LOGGER.warning("[export] failed: %s", exc)
+        if capture_response:
+            return None, ""
         return
 
-    payload = build_export_payload(snapshot)
+    decoded = body.decode("utf-8", errors="ignore")
+    if status >= 400:
+        _LOGGER.warning("[export] failed: HTTP Error %s: %s", status, resp.reason)
+    else:
+        _LOGGER.info("[export] sent status=%s", status)
+    if capture_response:
+        return status, decoded
 
-    try:
-        data = json.dumps(payload).encode("utf-8")
-    except Exception as exc:  # pragma: no cover
-        _LOGGER.warning("[export] failed: %s", exc)
+
+def _post_body(
+    data: bytes,
+    *,
+    extra_headers: Dict[str, str] | None = None,
+    capture_response: bool = False,
+    keep_alive: bool = False,
+):
+    url = os.getenv("LEADERBOARD_INGEST_URL")
+    secret = os.getenv("LEADERBOARD_INGEST_SECRET")
+    if not url or not secret:
         return
 
+    headers = {
+        "Content-Type": "application/json",
+        "X-Leaderboard-Secret": secret,
+    }
+    if extra_headers:
+        headers.update(extra_headers)
+    if keep_alive:
+        return _post_keep_alive(url, data, headers, capture_response=capture_response)
     req = urllib.request.Request(
         url,
         data=data,
-        headers={
-            "Content-Type": "application/json",
-            "X-Leaderboard-Secret": secret,
-        },
+        headers=headers,
         method="POST",
     )
 
@@ -92,11 +169,46 @@ def _post_snapshot(snapshot: Dict[str, Any], *, capture_response: bool = False):
             return status, body
 
 
-def send_export(snapshot: Dict[str, Any], *, capture_response: bool = False):
-    """Send the given snapshot to the ingest endpoint synchronously."""
+def _post_snapshot(snapshot: Dict[str, Any], *, capture_response: bool = False, keep_alive: bool = False):
+    payload = build_export_payload(snapshot)
+
+    try:
+        data = _dumps(payload)
+    except Exception as exc:  # pragma: no cover
+        _LOGGER.warning("[export] failed: %s", exc)
+        return
+
+    return _post_body(data, capture_response=capture_response, keep_alive=keep_alive)
+
+
+def send_export(snapshot: Dict[str, Any], *, capture_response: bool = False, keep_alive: bool = False):
+    """
+    Send the given snapshot to the ingest endpoint synchronously.
+    keep_alive=True reuses a per-thread HTTP connection (for bulk replays).
+    """
     if not _should_export():
         return
-    return _post_snapshot(snapshot.copy(), capture_response=capture_response)
+    return _post_snapshot(snapshot.copy(), capture_response=capture_response, keep_alive=keep_alive)
+
+
+def send_export_batch(snapshots: List[Dict[str, Any]], *, capture_response: bool = False, keep_alive: bool = False):
+    """Send several snapshots in one gzip-compressed {"batch": [...]} request."""
+    if not _should_export() or not snapshots:
+        return
+
+    try:
+        payload = {"batch": [build_export_payload(snapshot) for snapshot in snapshots]}
+        data = gzip.compress(_dumps(payload))
+    except Exception as exc:  # pragma: no cover
+        _LOGGER.warning("[export] failed: %s", exc)
+        return
+
+    return _post_body(
+        data,
+        extra_headers={"Content-Encoding": "gzip"},
+        capture_response=capture_response,
+        keep_alive=keep_alive,
+    )
 
 
 def export_latest_leaderboards(snapshot: Dict[str, Any]) -> None: